@@ -1,7 +1,6 @@
 let s:current_dir = expand("<sfile>:p:h")
 
 py3 << EOF
-import logging
 import os.path
 import os
 import sys
@@ -83,6 +82,12 @@ function! coqide#Deactivate()
     py3 plugin.cleanup()
     let s:activated = 0
 
+    for l:buf in getbufinfo()
+        if has_key(l:buf.variables, 'coqide_in_session')
+            call remove(l:buf.variables, 'coqide_in_session')
+        endif
+    endfor
+
     delcommand CoqNewSession
     delcommand CoqCloseSession
     delcommand CoqForward
@@ -99,13 +104,28 @@ endfunction
 
 function! coqide#NewSession()
     py3 plugin.new_session()
+    let b:coqide_in_session = py3eval('plugin.in_session()')
 endfunction
 
 function! coqide#CloseSession()
     py3 plugin.close_session()
+    unlet! b:coqide_in_session
+endfunction
+
+" Return 1 if the current buffer is in a session, without calling into
+" Python.
+function! coqide#CheckSession()
+    if get(b:, 'coqide_in_session', 0)
+        return 1
+    endif
+    echo 'Not in a Coq session'
+    return 0
 endfunction
 
 function! coqide#Forward()
+    if !coqide#CheckSession()
+        return
+    endif
     if g:coqide_auto_clear_messages
         call coqide#ClearMessages()
     endif
@@ -114,6 +134,9 @@ function! coqide#Forward()
 endfunction
 
 function! coqide#Backward()
+    if !coqide#CheckSession()
+        return
+    endif
     if g:coqide_auto_clear_messages
         call coqide#ClearMessages()
     endif
@@ -122,6 +145,9 @@ function! coqide#Backward()
 endfunction
 
 function! coqide#ToCursor()
+    if !coqide#CheckSession()
+        return
+    endif
     if g:coqide_auto_clear_messages
         call coqide#ClearMessages()
     endif
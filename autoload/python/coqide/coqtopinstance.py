@@ -2,22 +2,42 @@
 '''Coqtop process handle.'''
 
 import logging
-from queue import Queue, Empty
+import os
+import sys
 from subprocess import Popen, PIPE, TimeoutExpired
 from threading import Thread
 import xml.etree.ElementTree as ET
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None                             # pylint: disable=C0103
+
+try:
+    from lxml.etree import XMLPullParser, XMLSyntaxError as _ParseError
+except ImportError:
+    from xml.etree.ElementTree import XMLPullParser, ParseError as _ParseError
+
 from . import xmlprotocol as xp
+from .notifiabledeque import NotifiableDeque
 
 
 logger = logging.getLogger(__name__)         # pylint: disable=C0103
 
 
-_XML_DOCTYPE = '''<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN"
-                 "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd" [
-                 <!ENTITY nbsp ' '>
-                 <!ENTITY quot '"'>
-                 ]>'''
+_XML_DOCTYPE = b'''<!DOCTYPE root [ <!ENTITY nbsp ' '> ]>'''
+'''The document type fed to the parser once, declaring the entities coqtop
+uses beyond the predefined ones.'''
+
+
+_PIPE_BUFSIZE = 65536
+'''The buffer size of the pipes and the maximum size of each read.'''
+
+_PIPE_CAPACITY = 1 << 20
+'''The kernel buffer size requested for the stdout pipe of coqtop.'''
+
+_F_SETPIPE_SZ = getattr(fcntl, 'F_SETPIPE_SZ', None)
+'''The fcntl command to resize a pipe on Linux, or `None` if unavailable.'''
 
 
 class CoqtopQuit(Exception):
@@ -27,6 +47,8 @@ class CoqtopQuit(Exception):
 class _XMLLogger:        # pylint: disable=R0903
     '''A class that converts the XML document to its string representation.'''
 
+    __slots__ = ('_xml',)
+
     def __init__(self, xml):
         self._xml = xml
 
@@ -40,8 +62,12 @@ class _CoqtopReader:
     def __init__(self, pipe):
         self._pipe = pipe
         self._closed = False
-        self._thread = Thread(target=self._thread_entry)
-        self._res_queue = Queue()
+        self._parser = XMLPullParser(events=('start', 'end'))
+        self._parser.feed(_XML_DOCTYPE + b'<root>')
+        (_, self._root), = self._parser.read_events()
+        self._depth = 0
+        self._thread = Thread(target=self._thread_entry, daemon=True)
+        self._res_queue = NotifiableDeque()
 
     def start(self):
         '''Start the processor thread.'''
@@ -65,36 +91,58 @@ class _CoqtopReader:
         '''Get all the available responses.
 
         The method is non-blocking.'''
-        responses = []
-        try:
-            while True:
-                response = self._res_queue.get_nowait()
-                if response is None or self._closed:
-                    break
-                responses.append(response)
-        except Empty:
-            pass
+        responses = self._res_queue.get_all_nowait()
+        if None in responses:
+            del responses[responses.index(None):]
         return responses
 
     def _thread_entry(self):
-        chunks = []
         while True:
-            data = self._pipe.read1(1000)
+            data = self._pipe.read1(_PIPE_BUFSIZE)
             if not data:
-                self._closed = True
-                self._res_queue.put(None)
                 break
-
-            chunks.append(data)
-            doc = [_XML_DOCTYPE, '<root>'] + chunks + ['</root>']
             try:
-                root = ET.fromstringlist(doc)
-                for element in root:
+                self._feed(data)
+            except _ParseError:
+                logger.error('Bad coqtop output', exc_info=True)
+                break
+        self._closed = True
+        self._res_queue.put(None)
+
+    def _feed(self, data):
+        '''Feed `data` to the parser and queue the completed responses at once.
+
+        Each byte is parsed only once. The top-level elements are detached
+        from the synthetic root as soon as they are complete.'''
+        responses = []
+        debug = logger.isEnabledFor(logging.DEBUG)
+        self._parser.feed(data)
+        for event, element in self._parser.read_events():
+            if event == 'start':
+                self._depth += 1
+                continue
+
+            self._depth -= 1
+            if self._depth == 0:
+                if debug:
                     logger.debug('Coqtop response: %s', _XMLLogger(element))
-                    self._res_queue.put(element)
-                chunks = []
-            except ET.ParseError:
-                pass
+                responses.append(element)
+                self._root.remove(element)
+        self._res_queue.put_many(responses)
+
+
+def _enlarge_pipe(fd):
+    '''Try to enlarge the kernel buffer of the pipe `fd` to
+    `_PIPE_CAPACITY`, so that coqtop does not block when printing large
+    goals.
+
+    Nothing happens if the platform does not support it.'''
+    if _F_SETPIPE_SZ is None or not sys.platform.startswith('linux'):
+        return
+    try:
+        fcntl.fcntl(fd, _F_SETPIPE_SZ, _PIPE_CAPACITY)
+    except OSError:
+        logger.debug('Cannot enlarge the pipe buffer', exc_info=True)
 
 
 class CoqtopInstance:
@@ -103,12 +151,16 @@ class CoqtopInstance:
     def __init__(self):
         self._proc = None
         self._reader = None
+        self._stdin_fd = None
 
     def spawn(self, exec_args):
         '''Create the coqtop process.'''
         if self._proc is not None:
             raise RuntimeError('CoqtopInstance already spawned.')
-        self._proc = Popen(exec_args, stdin=PIPE, stdout=PIPE)
+        self._proc = Popen(exec_args, stdin=PIPE, stdout=PIPE,
+                           bufsize=_PIPE_BUFSIZE)
+        self._stdin_fd = self._proc.stdin.fileno()
+        _enlarge_pipe(self._proc.stdout.fileno())
         self._reader = _CoqtopReader(self._proc.stdout)
         self._reader.start()
 
@@ -118,11 +170,22 @@ class CoqtopInstance:
         '''
         if self._proc is None:
             raise RuntimeError('CoqtopInstance not spawned.')
-        req_xml = xp.req_to_xml(rtype, req)
-        req_bytes = ET.tostring(req_xml)
-        logger.debug('Coqtop request: %s', req_bytes)
-        self._proc.stdin.write(req_bytes)
-        self._proc.stdin.flush()
+        req_bytes = xp.req_to_bytes(rtype, req)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Coqtop request: %s', req_bytes)
+        self._write(req_bytes)
+
+    def _write(self, data):
+        '''Write `data` to the stdin of coqtop, bypassing the buffer of the
+        pipe object.
+
+        Raise `ValueError` if the stdin has been closed.'''
+        if self._stdin_fd is None or self._proc.stdin.closed:
+            raise ValueError('I/O operation on closed coqtop stdin.')
+        view = memoryview(data)
+        while view:
+            written = os.write(self._stdin_fd, view)
+            view = view[written:]
 
     def get_response(self, rtype):
         '''Get a reponse from coqtop.
@@ -144,12 +207,20 @@ class CoqtopInstance:
             raise ValueError('Bad coqtop response: {}'.format(
                 ET.tostring(xml)))
 
+    def begin_close(self):
+        '''Ask the coqtop process to quit without waiting for it.
+
+        `close` must still be called to reap the process.'''
+        if self._proc is not None:
+            self._proc.stdin.close()
+            self._stdin_fd = None
+
     def close(self):
         '''Terminate the coqtop process.'''
         if self._proc is None:
             return
 
-        self._proc.stdin.close()
+        self.begin_close()
         try:
             self._proc.wait(timeout=5)
         except TimeoutExpired:
@@ -159,6 +230,7 @@ class CoqtopInstance:
         self._reader.join()
         self._proc = None
         self._reader = None
+        self._stdin_fd = None
 
     def get_feedbacks(self):
         '''Read all the available feedbacks.'''
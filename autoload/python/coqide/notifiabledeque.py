@@ -0,0 +1,79 @@
+'''A deque that blocks the consumers until items are available.'''
+
+from collections import deque
+from threading import Event
+
+
+class NotifiableDeque:
+    '''A FIFO queue built on `collections.deque` and `threading.Event`.
+
+    Unlike `queue.Queue`, no lock is taken when putting or getting items.
+    '''
+
+    __slots__ = ('_deque', '_event')
+
+    def __init__(self):
+        self._deque = deque()
+        self._event = Event()
+
+    def put(self, item):
+        '''Append `item` to the queue and wake up the consumers.'''
+        self._deque.append(item)
+        self._notify()
+
+    def put_many(self, items):
+        '''Append all the `items` to the queue and wake up the consumers once.'''
+        if items:
+            self._deque.extend(items)
+            self._notify()
+
+    def _notify(self):
+        '''Set the event unless it is already set.
+
+        `Event.set` always takes a lock, while `Event.is_set` does not. The
+        consumers clear the event only after finding the deque empty and
+        check the deque again afterwards, so skipping `set` cannot lose an
+        item.'''
+        if not self._event.is_set():
+            self._event.set()
+
+    def get(self):
+        '''Remove and return the first item, blocking until it is available.'''
+        while True:
+            self._event.wait()
+            try:
+                return self.get_nowait()
+            except IndexError:
+                pass
+
+    def get_nowait(self):
+        '''Remove and return the first item.
+
+        Raise `IndexError` if the queue is empty.'''
+        try:
+            return self._deque.popleft()
+        finally:
+            if not self._deque:
+                self._event.clear()
+                # An item may be put between the check and `clear`.
+                if self._deque:
+                    self._event.set()
+
+    def get_all_nowait(self):
+        '''Remove and return all the items as a list.
+
+        Return an empty list at once if the queue is empty, without touching
+        the event.'''
+        if not self._deque:
+            return []
+        items = []
+        popleft = self._deque.popleft
+        try:
+            while True:
+                items.append(popleft())
+        except IndexError:
+            pass
+        self._event.clear()
+        if self._deque:
+            self._event.set()
+        return items
@@ -1,10 +1,10 @@
 '''The plugin module.'''
 
 from functools import wraps
-from queue import Queue
-from threading import Thread, Lock
+from threading import Thread
 import logging
 
+from coqide.notifiabledeque import NotifiableDeque
 from coqide.vimsupport import VimSupport
 from coqide.views import TabpageView, SessionView
 from coqide.session import Session
@@ -18,17 +18,18 @@ class _ThreadExecutor:
     '''
 
     def __init__(self):
-        self._task_queue = Queue()
+        self._task_queue = NotifiableDeque()
         self._closed = False
-        self._task_count = 0
-        self._task_count_lock = Lock()
-        self._thread = Thread(target=self._thread_main)
+        # Each counter is written by one thread only: `_submitted` by the
+        # submitter and `_completed` by the background thread.
+        self._submitted = 0
+        self._completed = 0
+        self._thread = Thread(target=self._thread_main, daemon=True)
         self._thread.start()
 
     def submit(self, func, *args, **kwargs):
         '''Schedule the task `fn(*args, **kwargs)` to be executed.'''
-        with self._task_count_lock:
-            self._task_count += 1
+        self._submitted += 1
         self._task_queue.put((func, args, kwargs))
 
     def shutdown(self):
@@ -37,6 +38,13 @@ class _ThreadExecutor:
         The tasks that have not been executed are cancelled.
         '''
         self._closed = True
+        try:
+            while True:
+                self._task_queue.get_nowait()
+                # The cancelled tasks will never complete.
+                self._submitted -= 1
+        except IndexError:
+            pass
         self._task_queue.put(None)
         self._thread.join()
 
@@ -49,15 +57,16 @@ class _ThreadExecutor:
             func, args, kwargs = task
             try:
                 func(*args, **kwargs)
-            except Exception:
+            except Exception:                # pylint: disable=W0703
+                # Keep the thread alive so that the later tasks still run
+                # and `is_busy` does not stay True forever.
                 logger.exception('Background thread has exception')
-                raise
-            with self._task_count_lock:
-                self._task_count -= 1
+            finally:
+                self._completed += 1
 
     def is_busy(self):
         '''Return True if the background thread is executing tasks.'''
-        return self._task_count > 0
+        return self._submitted != self._completed
 
 
 def _in_session(func):
@@ -87,11 +96,9 @@ def _not_busy(func):
 
 
 def _draw_views(func):
-    '''Draw the changes of views to Vim before and after the function
-    is called.'''
+    '''Draw the changes of views to Vim after the function is called.'''
     @wraps(func)
     def _wrapped(self, *args, **kwargs):
-        self.do_draw_views()
         try:
             func(self, *args, **kwargs)
         finally:
@@ -109,6 +116,29 @@ def _catch_exception(func):
             logger.exception('Exception in plugin')
     return _wrapped
 
+
+def _session_command(func):
+    '''Decorate a command on the session of the current buffer.
+
+    It is the same as stacking `_catch_exception`, `_draw_views`,
+    `_in_session` and `_not_busy` in this order, but in a single wrapper.'''
+    @wraps(func)
+    def _wrapped(self):
+        try:
+            try:
+                buf = self._vim.get_buffer()                 # pylint: disable=W0212
+                session = self._sessions.get(buf.number)     # pylint: disable=W0212
+                if session is None:
+                    print('Not in a Coq session')
+                elif not self._worker.is_busy():             # pylint: disable=W0212
+                    func(self, session, buf)
+            finally:
+                self.do_draw_views()
+        except:                # pylint: disable=W0702
+            logger.exception('Exception in plugin')
+    return _wrapped
+
+
 class Plugin:
     '''The plugin entry point.'''
 
@@ -145,28 +175,19 @@ class Plugin:
         del self._sessions[buf.number]
         del self._session_views[buf.number]
 
-    @_catch_exception
-    @_draw_views
-    @_in_session
-    @_not_busy
+    @_session_command
     def forward_one(self, session, buf):     # pylint: disable=R0201
         '''Forward one sentence.'''
         logger.debug('Session [%s]: forward one', buf.name)
         session.forward_one()
 
-    @_catch_exception
-    @_draw_views
-    @_in_session
-    @_not_busy
+    @_session_command
     def backward_one(self, session, buf):    # pylint: disable=R0201
         '''Backward one sentence.'''
         logger.debug('Session [%s]: backward one', buf.name)
         session.backward_one()
 
-    @_catch_exception
-    @_draw_views
-    @_in_session
-    @_not_busy
+    @_session_command
     def to_cursor(self, session, buf):       # pylint: disable=R0201
         '''Run to cursor.'''
         logger.debug('Session [%s]: to cursor', buf.name)
@@ -234,9 +255,16 @@ class Plugin:
         logger.debug('Clear messages')
         self._tabpage_view.clear_messages()
 
+    def in_session(self):
+        '''Return True if the current buffer is in a session.'''
+        return self._vim.get_buffer().number in self._sessions
+
     def cleanup(self):
         '''Cleanup the plugin.'''
         logger.debug('Plugin clean up')
+        # Let all the coqtop processes quit in parallel before reaping them.
+        for session in self._sessions.values():
+            session.begin_close()
         for session in self._sessions.values():
             session.close()
         for view in self._session_views.values():
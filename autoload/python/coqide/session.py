@@ -12,6 +12,8 @@ logger = logging.getLogger(__name__)         # pylint: disable=C0103
 class Session:
     '''A loaded Coq source file and its coqtop interpreter.'''
 
+    __slots__ = ('_coqtop', '_view', '_stm', '_vim', '_worker')
+
     def __init__(self, view, vim, worker):
         '''Create a new session.'''
         self._coqtop = CoqtopInstance()
@@ -49,12 +51,7 @@ class Session:
 
     def _forward_between(self, from_mark, to_mark):
         '''Add the sentences between `from_mark` and `to_mark` to the STM.'''
-        sentences = []
-
-        sentence = self._vim.get_sentence_after(from_mark)
-        while sentence and sentence.stop <= to_mark:
-            sentences.append(sentence)
-            sentence = self._vim.get_sentence_after(sentence.stop)
+        sentences = self._vim.get_sentences_between(from_mark, to_mark)
         self._worker.submit(self._stm.add, sentences)
 
     def process_feedbacks(self):
@@ -64,9 +61,11 @@ class Session:
             self._worker.submit(self._do_process_feedbacks, feedbacks)
 
     def _do_process_feedbacks(self, feedbacks):
-        for feedback in feedbacks:
-            logger.debug('Session feedback: %s', feedback)
-            self._stm.process_feedback(feedback)
+        self._stm.process_feedback_many(feedbacks)
+
+    def begin_close(self):
+        '''Ask the coqtop process to quit without waiting for it.'''
+        self._coqtop.begin_close()
 
     def close(self):
         '''Close the session.'''
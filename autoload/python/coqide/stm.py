@@ -1,6 +1,7 @@
 '''State and state machine.'''
 
 import logging
+from bisect import bisect_left, bisect_right
 
 from .types import StateID, Mark
 
@@ -15,13 +16,21 @@ class _State:
     result from the coqtop process.
     '''
 
+    __slots__ = ('state_id', 'sentence', '_flag', '_view', '_match_id',
+                 '_part_match_id', '_next_rev_num', 'prev', 'next')
+
     def __init__(self, state_id, sentence, view):
         self.state_id = state_id
         self.sentence = sentence
         self._flag = None
         self._view = view
-        self._match_ids = []
+        # The match of the whole sentence and that of the error part.
+        self._match_id = None
+        self._part_match_id = None
         self._next_rev_num = 1
+        # The neighbours in the `_StateList` the state belongs to.
+        self.prev = None
+        self.next = None
 
     def move(self, line_offset):
         '''Move the position of the sentence.'''
@@ -39,14 +48,22 @@ class _State:
         - "error": the sentence contains errors.
 
         If `flag == "error"`, `loc` is the tuple marking the error region.
+
+        Nothing is redrawn if the flag is unchanged, except for "error" whose
+        region may differ.
         '''
         if not self._view:
             return
+        if flag == self._flag and flag != 'error':
+            return
 
         self._flag = flag
-        for match_id in self._match_ids:
-            self._view.remove_match(match_id)
-        self._match_ids.clear()
+        if self._match_id is not None:
+            self._view.remove_match(self._match_id)
+            self._match_id = None
+        if self._part_match_id is not None:
+            self._view.remove_match(self._part_match_id)
+            self._part_match_id = None
 
         if flag is None:
             return
@@ -54,7 +71,7 @@ class _State:
         new_match_id = self._alloc_match_id()
         self._view.new_match(new_match_id, self.sentence.start,
                              self.sentence.stop, flag)
-        self._match_ids.append(new_match_id)
+        self._match_id = new_match_id
 
         if flag == 'error' and loc and loc.start and loc.stop:
             new_match_id = self._alloc_match_id()
@@ -62,7 +79,7 @@ class _State:
             part_stop = self.offset_to_mark(loc.stop)
             self._view.new_match(new_match_id, part_start,
                                  part_stop, 'error_part')
-            self._match_ids.append(new_match_id)
+            self._part_match_id = new_match_id
 
     def _alloc_match_id(self):
         new_match_id = (self.state_id, self._next_rev_num)
@@ -80,22 +97,15 @@ class _State:
     def offset_to_mark(self, offset):
         '''Transform the position representing as the offset in the sentence
         to the (line, col) mark in the document.'''
-        line = self.sentence.start.line
-        col = self.sentence.start.col
+        start = self.sentence.start
         text = self.sentence.text
-        tlen = len(text)
-        counter = 0
-        offset = min(offset, tlen)
-
-        while counter < offset:
-            if text[counter] == '\n':
-                line += 1
-                col = 1
-            else:
-                col += 1
-            counter += 1
+        offset = min(offset, len(text))
 
-        return Mark(line, col)
+        nr_newlines = text.count('\n', 0, offset)
+        if nr_newlines == 0:
+            return Mark(start.line, start.col + offset)
+        last_newline = text.rfind('\n', 0, offset)
+        return Mark(start.line + nr_newlines, offset - last_newline)
 
     @staticmethod
     def initial(state_id):
@@ -104,109 +114,146 @@ class _State:
 
 
 class _StateList:
-    '''The data structure to manage state objects.'''
+    '''The data structure to manage state objects.
+
+    The states are linked through their `prev` and `next` attributes.
+    Besides, the states after the initial one are kept in document order in
+    `_states`, with their stop marks in `_stops`, so that `find_by_mark` can
+    bisect.
+    '''
 
     def __init__(self):
-        self._head_node = None
-        self._tail_node = None
+        self._head_state = None
+        self._tail_state = None
         self._state_id_map = {}
-        self._sentence_set = set()
+        self._states = []
+        self._stops = []
 
     def init(self, state):
         '''Initialize the state list with the initial state.'''
-        initial_node = {'state': state, 'prev': None, 'next': None}
-        self._head_node = initial_node
-        self._tail_node = initial_node
-        self._state_id_map[state.state_id] = initial_node
+        state.prev = None
+        state.next = None
+        self._head_state = state
+        self._tail_state = state
+        self._state_id_map[state.state_id] = state
 
     def find_prev(self, state_id):
         '''Return the previous state of `state_id`.'''
-        prev = self._state_id_map[state_id]['prev']
-        if prev:
-            return prev['state']
-        return None
+        return self._state_id_map[state_id].prev
 
     def find_by_id(self, state_id):
         '''Return the state by the state id.'''
-        node = self._state_id_map.get(state_id)
-        if node:
-            return node['state']
-        return None
+        return self._state_id_map.get(state_id)
 
     def find_by_mark(self, mark):
         '''Return the state before `mark`.'''
-        prev_node = self._head_node
-        node = self._head_node['next']
-        while node is not None:
-            stop = node['state'].sentence.stop
-            if stop > mark:
-                break
-            prev_node = node
-            node = node['next']
-        return prev_node['state']
+        index = bisect_right(self._stops, mark)
+        if index == 0:
+            return self._head_state
+        return self._states[index - 1]
+
+    def _index_of(self, state):
+        '''Return the index of `state` in `_states`, or -1 for the initial
+        state.
+
+        Only the states sharing the stop mark of `state` are compared, so
+        `_stops` must be sorted.'''
+        if state.sentence is None:
+            return -1
+        stop = state.sentence.stop
+        index = bisect_left(self._stops, stop)
+        end = bisect_right(self._stops, stop, index)
+        while index < end and self._states[index] is not state:
+            index += 1
+        assert index < end, 'State not found at its stop mark.'
+        return index
 
     def has_sentence(self, sentence):
-        '''Return True if the sentence is in the list.'''
-        return sentence in self._sentence_set
+        '''Return True if the sentence is in the list.
+
+        The sentence is only compared with the states whose stop mark
+        matches.'''
+        index = bisect_left(self._stops, sentence.stop)
+        end = bisect_right(self._stops, sentence.stop, index)
+        return any(state.sentence == sentence
+                   for state in self._states[index:end])
 
     def insert(self, prev_state, state):
         '''Insert the new `state` after `prev_state`.'''
         assert not self.has_sentence(state.sentence)
-        prev_node = self._state_id_map[prev_state.state_id]
-        node = {'state': state, 'prev': prev_node, 'next': prev_node['next']}
-        self._state_id_map[state.state_id] = node
-        if prev_node['next']:
-            prev_node['next']['prev'] = node
+        self._state_id_map[state.state_id] = state
+        state.prev = prev_state
+        state.next = prev_state.next
+        if prev_state.next:
+            prev_state.next.prev = state
         else:
-            self._tail_node = node
-        prev_node['next'] = node
-        self._sentence_set.add(state.sentence)
+            self._tail_state = state
+        prev_state.next = state
+        index = self._index_of(prev_state) + 1
+        self._states.insert(index, state)
+        self._stops.insert(index, state.sentence.stop)
 
     def iter_between(self, begin, end):
         '''Return an iterator from the next of `begin` to `end` (inclusive).'''
-        node = self._state_id_map[begin.state_id]['next']
-        end = self._state_id_map[end.state_id]['next']
-        while node and node != end:
-            yield node['state']
-            node = node['next']
+        state = begin.next
+        end = end.next
+        while state is not None and state is not end:
+            yield state
+            state = state.next
 
     def iter_after(self, begin):
         '''Return an iterator from the next of `begin` to the end.'''
-        node = self._state_id_map[begin.state_id]['next']
-        while node:
-            yield node['state']
-            node = node['next']
+        state = begin.next
+        while state is not None:
+            yield state
+            state = state.next
 
     def remove_between(self, begin, end):
         '''Remove the states from the next of `begin` to `end` (inclusive).'''
-        begin_node = self._state_id_map[begin.state_id]
-        end_node = self._state_id_map[end.state_id]
-
-        for state in self.iter_between(begin, end):
-            del self._state_id_map[state.state_id]
-            self._sentence_set.remove(state.sentence)
-
-        post_end_node = end_node['next']
-        begin_node['next'] = post_end_node
-        if post_end_node:
-            post_end_node['prev'] = begin_node
+        first = self._index_of(begin) + 1
+        last = self._index_of(end) + 1
+        post_end = end.next
+
+        state = begin.next
+        while state is not post_end:
+            next_state = state.next
+            self._forget(state)
+            state = next_state
+
+        del self._states[first:last]
+        del self._stops[first:last]
+
+        begin.next = post_end
+        if post_end:
+            post_end.prev = begin
         else:
-            self._tail_node = begin_node
+            self._tail_state = begin
 
     def remove_after(self, begin):
         '''Remove the states from the next of `begin` to the end.'''
-        begin_node = self._state_id_map[begin.state_id]
-
-        for state in self.iter_after(begin):
-            del self._state_id_map[state.state_id]
-            self._sentence_set.remove(state.sentence)
-
-        begin_node['next'] = None
-        self._tail_node = begin_node
+        state = begin.next
+        while state is not None:
+            next_state = state.next
+            self._forget(state)
+            state = next_state
+
+        first = self._index_of(begin) + 1
+        del self._states[first:]
+        del self._stops[first:]
+
+        begin.next = None
+        self._tail_state = begin
+
+    def _forget(self, state):
+        '''Drop `state` from the lookup tables and unlink it, so that a
+        removed state never leads back into the list.'''
+        del self._state_id_map[state.state_id]
+        state.prev = None
+        state.next = None
 
     def end(self):
         '''Return the state at the end of the document.'''
-        return self._tail_node['state']
+        return self._tail_state
 
 
 class STM:
@@ -216,8 +263,18 @@ class STM:
         self._coqtop = coqtop
         self._view = view
         self._fb_handler = fb_handler
+        # The handlers for each feedback type, bound once per instance.
+        self._fb_dispatch = {
+            'axiom': self._on_axiom,
+            'processed': self._on_processed,
+            'message': self._on_message,
+            'errormsg': self._on_message,
+        }
         self._state_list = _StateList()
         self._tip_state = None
+        # The "processed" feedbacks usually come in state order, so the
+        # next one is likely for the state after the last one.
+        self._last_processed = None
 
     def init(self):
         '''Initialize the state machine.'''
@@ -311,7 +368,8 @@ class STM:
 
     def _edit_at_state(self, state):
         '''Edit at `state`.'''
-        logger.debug('Edit at state %s', state.state_id.val)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Edit at state %s', state.state_id.val)
 
         self._coqtop.call('edit_at', {'state_id': state.state_id})
         res, err = self._get_value_response('edit_at')
@@ -345,19 +403,26 @@ class STM:
             self._view.set_goals(res['goals'])
 
     def _on_axiom(self, feedback):
-        state = self._state_list.find_by_id(feedback['state_id'])
+        state = self._state_list.find_by_id(feedback.state_id)
         if state:
             state.set_flag('axiom')
 
     def _on_processed(self, feedback):
-        state = self._state_list.find_by_id(feedback['state_id'])
-        if state and state.get_flag() in (None, 'sent'):
+        state = self._last_processed
+        if state is not None:
+            state = state.next
+        if state is None or state.state_id != feedback.state_id:
+            state = self._state_list.find_by_id(feedback.state_id)
+            if state is None:
+                return
+        self._last_processed = state
+        if state.get_flag() in (None, 'sent'):
             state.set_flag('verified')
 
     def _on_message(self, feedback):
-        level, text = feedback['content']['message']
-        loc = feedback['content']['loc']
-        state_id = feedback['state_id']
+        level, text = feedback.content['message']
+        loc = feedback.content['loc']
+        state_id = feedback.state_id
         self._view.show_message(level, text)
 
         if level == 'error':
@@ -365,19 +430,26 @@ class STM:
             if state:
                 state.set_flag('error', loc)
 
-    _FEEDBACK_HANDLERS = {
-        'axiom': _on_axiom,
-        'processed': _on_processed,
-        'message': _on_message,
-        'errormsg': _on_message,
-    }
-    '''The handlers for each feedback.'''
-
     def process_feedback(self, feedback):
         '''Process the given feedback.'''
-        logger.debug('STM feedback: %s', feedback)
-        fb_type = feedback['type']
-        if fb_type in self._FEEDBACK_HANDLERS:
-            self._FEEDBACK_HANDLERS[fb_type](self, feedback)
-        else:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('STM feedback: %s', feedback)
+        handler = self._fb_dispatch.get(feedback.type)
+        if handler is None:
             self._fb_handler(feedback)
+        else:
+            handler(feedback)
+
+    def process_feedback_many(self, feedbacks):
+        '''Process the given feedbacks in order.'''
+        debug = logger.isEnabledFor(logging.DEBUG)
+        handlers = self._fb_dispatch
+        fb_handler = self._fb_handler
+        for feedback in feedbacks:
+            if debug:
+                logger.debug('STM feedback: %s', feedback)
+            handler = handlers.get(feedback.type)
+            if handler is None:
+                fb_handler(feedback)
+            else:
+                handler(feedback)
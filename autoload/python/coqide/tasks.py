@@ -1,25 +1,26 @@
 '''The action dispatching module.'''
 
 
-from threading import Lock
+from collections import deque
 
 
 # pylint: disable=C0103
-_task_list = []
-_task_lock = Lock()
+_task_list = deque()
 
 
 def dispatch(func, *args, **kwargs):
     '''Dispatch a task.
 
     The task will be run when `run_tasks` is called.'''
-    with _task_lock:
-        _task_list.append((func, args, kwargs))
+    _task_list.append((func, args, kwargs))
 
 
 def run_tasks():
-    '''Run the pending tasks.'''
-    with _task_lock:
-        for func, args, kwargs in _task_list:
-            func(*args, **kwargs)
-        _task_list.clear()
+    '''Run the pending tasks.
+
+    `deque.append` and `deque.popleft` are atomic, so no lock is needed and
+    the tasks may dispatch new tasks. Only the tasks pending on entry are
+    run; those dispatched meanwhile run on the next call.'''
+    for _ in range(len(_task_list)):
+        func, args, kwargs = _task_list.popleft()
+        func(*args, **kwargs)
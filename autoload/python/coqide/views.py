@@ -5,6 +5,8 @@ from collections import namedtuple
 import logging
 from threading import Lock
 
+from coqide.types import Mark
+
 
 logger = logging.getLogger(__name__)         # pylint: disable=C0103
 
@@ -147,6 +149,8 @@ class _MatchView:
         self._match_map = {}
         self._win_executors = {}
         self._vim = vim
+        # Set after scheduling tasks and cleared by `draw` before running them.
+        self._dirty = False
 
     def set_active(self, winid):
         '''Show the view in the window-ID `winid`.'''
@@ -155,7 +159,7 @@ class _MatchView:
 
         self._win_executors[winid] = _TaskExecutor()
 
-        with self._vim.in_winid(winid):
+        with self._vim.in_winid(winid), self._vim.batch_matches():
             for match in self._match_map.values():
                 match.show(winid)
 
@@ -164,9 +168,12 @@ class _MatchView:
         if winid not in self._win_executors:
             return
 
-        del self._win_executors[winid]
+        executor = self._win_executors.pop(winid)
 
-        with self._vim.in_winid(winid):
+        with self._vim.in_winid(winid), self._vim.batch_matches():
+            # Run the pending tasks first so that the matches removed from
+            # `_match_map` are also hidden.
+            executor.run_all()
             for match in self._match_map.values():
                 match.hide(winid)
 
@@ -178,18 +185,20 @@ class _MatchView:
 
         for winid, executor in self._win_executors.items():
             executor.add(match_id, match.show, winid)
+        self._dirty = True
 
     def move(self, match_id, line_offset):
         '''Move the match `line_offset` lines down.'''
         match = self._match_map[match_id]
 
-        start, stop, _ = match.match_arg
-        match.match_arg = match.match_arg._replace(
-            start=start._replace(line=start.line + line_offset),
-            stop=stop._replace(line=stop.line + line_offset))
+        start, stop, match_type = match.match_arg
+        match.match_arg = _MatchArg(Mark(start.line + line_offset, start.col),
+                                    Mark(stop.line + line_offset, stop.col),
+                                    match_type)
 
         for winid, executor in self._win_executors.items():
             executor.add_nokey(match.redraw, winid)
+        self._dirty = True
 
     def remove(self, match_id):
         '''Remove the match.'''
@@ -199,6 +208,7 @@ class _MatchView:
         for winid, executor in self._win_executors.items():
             if not executor.cancel(match_id):
                 executor.add_nokey(match.hide, winid)
+        self._dirty = True
 
     def draw(self):
         '''Draw the matches in the Vim window.
@@ -206,9 +216,13 @@ class _MatchView:
         This function only applies the changes since the last time it is called
         to Vim.
         '''
+        if not self._dirty:
+            return
+        self._dirty = False
+
         for winid, executor in self._win_executors.items():
             if executor.has_task():
-                with self._vim.in_winid(winid):
+                with self._vim.in_winid(winid), self._vim.batch_matches():
                     executor.run_all()
 
 
@@ -281,14 +295,16 @@ class SessionView:
 
     def show_message(self, level, message):
         '''Show the message in the message window.'''
-        logger.debug('SView show message: %s %s', level, message)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('SView show message: %s %s', level, message)
         self._messages.append((level, message))
         if self._focused:
             self._tabpage_view.show_message(level, message)
 
     def set_goals(self, goals):
         '''Show the goals in the goal window.'''
-        logger.debug('SView set goals: %s', goals)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('SView set goals: %s', goals)
         self._goals = goals
         if self._focused:
             self._tabpage_view.set_goals(goals)
@@ -328,18 +344,21 @@ class SessionView:
 
     def new_match(self, match_id, start, stop, match_type):
         '''Create a new match on the window and return the match object.'''
-        logger.debug('SView new match: %s %s %s %s', match_id, start, stop,
-                     match_type)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('SView new match: %s %s %s %s', match_id, start,
+                         stop, match_type)
         self._match_view.add(match_id, start, stop, match_type)
 
     def move_match(self, match_id, line_offset):
         '''Move the position of a match.'''
-        logger.debug('SView move match: %s %s', match_id, line_offset)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('SView move match: %s %s', match_id, line_offset)
         self._match_view.move(match_id, line_offset)
 
     def remove_match(self, match_id):
         '''Remove a match.'''
-        logger.debug('SView remove match: %s', match_id)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('SView remove match: %s', match_id)
         self._match_view.remove(match_id)
 
     def destroy(self):
@@ -1,7 +1,7 @@
 '''The functions for Vim operations.'''
 
 from contextlib import contextmanager
-from itertools import chain
+from itertools import chain, islice, takewhile
 
 from coqide.types import Mark, Sentence
 
@@ -183,13 +183,18 @@ class _SentenceEndMatcher:
 
 
 class _MatchAdder:
-    '''Add matches where the number of lines exceeds 8.'''
+    '''Add matches where the number of lines exceeds 8.
 
-    def __init__(self, hlgroup, api):
+    If `pending` is not None, the `matchaddpos` calls are appended to it
+    as pairs (cmd, ids) instead of being evaluated, and the match IDs are
+    appended to `ids` when the calls are evaluated later.'''
+
+    def __init__(self, hlgroup, api, pending=None):
         self._args = []
         self._ids = []
         self._hlgroup = hlgroup
         self._api = api
+        self._pending = pending
 
     def add(self, line, start_col, len_):
         '''Add part of a line to the match.'''
@@ -213,7 +218,10 @@ class _MatchAdder:
 
     def _matchaddpos(self):
         cmd = 'matchaddpos("{}", {})'.format(self._hlgroup, self._args)
-        self._ids.append(int(self._api.eval(cmd)))
+        if self._pending is None:
+            self._ids.append(int(self._api.eval(cmd)))
+        else:
+            self._pending.append((cmd, self._ids))
         self._args.clear()
 
 
@@ -230,6 +238,7 @@ class VimSupport:
             self._api = vim
         else:
             self._api = api
+        self._batch = None
 
     def get_buffer(self):
         '''Return the current buffer.'''
@@ -241,34 +250,51 @@ class VimSupport:
 
     def get_sentence_after(self, start):
         '''Return the sentence object containing the text after the start mark.'''
-        # Map 1-indexed position into 0-indexed.
-        start_line, start_col = start.line - 1, start.col - 1
-        matcher = _SentenceEndMatcher()
+        return next(self._iter_sentences(start), None)
 
-        # The cursor is 1-indexed.
-        cursor_line, cursor_col = start
+    def get_sentences_between(self, start, stop):
+        '''Return the list of the consecutive sentences after the start mark
+        that end before or at the stop mark.
 
-        vimbuf = self._api.current.buffer
+        The buffer is scanned only once, and the lines up to the stop mark
+        are fetched from Vim in one slice.'''
+        return list(takewhile(lambda sentence: sentence.stop <= stop,
+                              self._iter_sentences(start, stop.line)))
 
-        for char in chain(vimbuf[start_line][start_col:], ['\n']):
-            matched = matcher.feed(char)
-            if matched:
-                stop = Mark(cursor_line, cursor_col)
-                return Sentence(matcher.text(), start, stop)
-            cursor_col += 1
+    def _iter_sentences(self, start, last_line=None):
+        '''Yield the consecutive sentences after the start mark.
 
-        for line in vimbuf[start_line+1:]:
-            cursor_line += 1
-            cursor_col = 1
+        If `last_line` is given, only the lines up to it are scanned.'''
+        vimbuf = self._api.current.buffer
+        # The cursor is 1-indexed.
+        cursor_line, cursor_col = start
+        matcher = _SentenceEndMatcher()
 
+        # Map 1-indexed position into 0-indexed.
+        if last_line is None:
+            first_line = vimbuf[start.line - 1]
+            rest = (vimbuf[i] for i in range(start.line, len(vimbuf)))
+        else:
+            fetched = vimbuf[start.line - 1:last_line]
+            if not fetched:
+                return
+            first_line = fetched[0]
+            rest = islice(fetched, 1, None)
+        lines = chain([first_line[start.col - 1:]], rest)
+
+        for line in lines:
             for char in chain(line, ['\n']):
-                matched = matcher.feed(char)
-                if matched:
+                if matcher.feed(char):
                     stop = Mark(cursor_line, cursor_col)
-                    return Sentence(matcher.text(), start, stop)
+                    yield Sentence(matcher.text(), start, stop)
+                    # The next sentence starts with the character at the stop
+                    # mark.
+                    start = stop
+                    matcher = _SentenceEndMatcher()
+                    matcher.feed(char)
                 cursor_col += 1
-
-        return None
+            cursor_line += 1
+            cursor_col = 1
 
     def get_cursor(self):
         '''Return the position of the cursor in Mark.'''
@@ -277,8 +303,13 @@ class VimSupport:
 
     def add_match(self, start, stop, hlgroup):
         '''Add a match to the current window and return the match id.'''
-        buf = self.get_buffer()
-        match_adder = _MatchAdder(hlgroup, self._api)
+        if self._batch:
+            buf = self._batch[2]
+            pending = self._batch[0]
+        else:
+            buf = self.get_buffer()
+            pending = None
+        match_adder = _MatchAdder(hlgroup, self._api, pending)
 
         if start.line == stop.line:
             len1 = stop.col - start.col
@@ -299,9 +330,51 @@ class VimSupport:
 
     def del_match(self, match_id):
         '''Remove the match of the given id.'''
+        if self._batch:
+            self._batch[1].append(match_id)
+            return
         for id_ in match_id:
             self._api.eval('matchdelete({})'.format(id_))
 
+    @contextmanager
+    def batch_matches(self):
+        '''Defer the calls to `add_match` and `del_match` and send them to
+        Vim at the end of the block, with one `eval` for the additions and
+        one for the deletions.
+
+        The match ids returned by `add_match` in the block are filled in
+        when the block ends. The current buffer must not change in the
+        block. The deletion of a match that no longer exists is ignored.'''
+        if self._batch:
+            yield
+            return
+
+        self._batch = ([], [], self.get_buffer())
+        try:
+            yield
+        finally:
+            adds, deletes, _ = self._batch
+            self._batch = None
+            if adds:
+                cmd = '[{}]'.format(', '.join(cmd for cmd, _ in adds))
+                for (_, ids), id_ in zip(adds, self._api.eval(cmd)):
+                    ids.append(int(id_))
+            # The deletions may refer to the matches added in the block, so
+            # they are sent after the additions.
+            cmds = ['matchdelete({})'.format(id_)
+                    for match_id in deletes for id_ in match_id]
+            if cmds:
+                try:
+                    self._api.eval('[{}]'.format(', '.join(cmds)))
+                except self._api.error:
+                    # A stale id, e.g. after `clearmatches()`, fails the whole
+                    # list. Delete the matches one by one to remove the rest.
+                    for cmd in cmds:
+                        try:
+                            self._api.eval(cmd)
+                        except self._api.error:
+                            pass
+
     @contextmanager
     def in_winid(self, winid):
         '''Switch to the window of the window-ID.'''
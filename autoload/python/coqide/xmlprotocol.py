@@ -64,10 +64,11 @@ All other types are records represented by a node named like the OCaml
 type which contains a flattened n-tuple.
 '''
 
+from xml.sax.saxutils import escape
 import xml.etree.ElementTree as ET
 
 from .types import Unit, StateID, Some, UnionL, UnionR, Goals, Goal, \
-    Location, Message
+    Location, Message, Feedback
 
 ## ==================
 ## Basic types
@@ -145,9 +146,29 @@ list.
 '''
 
 
+def _index_converters_to_xml(converters):
+    '''Return a dict mapping each type used as a match to its converter.
+
+    None of those types is matched by an earlier entry of `converters`, so
+    looking up the exact type of a value picks the same converter as trying
+    the list in order.'''
+    index = {}
+    for match, convert in converters:
+        if isinstance(match, type):
+            index.setdefault(match, convert)
+    return index
+
+
+_CONVERTERS_TO_XML_BY_TYPE = _index_converters_to_xml(_CONVERTERS_TO_XML)
+'''The converters in `_CONVERTERS_TO_XML` indexed by the exact type.'''
+
+
 def _data_to_xml(data):
     '''Serialize a Python object into a XML element by the rules defined in
     `_CONVERTERS_TO_XML`.'''
+    convert = _CONVERTERS_TO_XML_BY_TYPE.get(type(data))
+    if convert is not None:
+        return convert(data)
     for match, convert in _CONVERTERS_TO_XML:
         if isinstance(match, type):
             if isinstance(data, match):
@@ -160,19 +181,19 @@ def _data_to_xml(data):
 
 _CONVERTERS_FROM_XML = [
     ['unit', lambda _: Unit()],
-    [lambda v: v.tag == 'bool' and v.attrib['val'] == 'true', lambda _: True],
-    [lambda v: v.tag == 'bool' and v.attrib['val'] == 'false', lambda _: False],
+    [('bool', lambda v: v.attrib['val'] == 'true'), lambda _: True],
+    [('bool', lambda v: v.attrib['val'] == 'false'), lambda _: False],
     ['string', lambda v: v.text or ''],
     ['int', lambda v: int(v.text)],
     ['state_id', lambda v: StateID(int(v.attrib['val']))],
     ['list', lambda v: [_data_from_xml(i) for i in v]],
-    [lambda v: v.tag == 'option' and v.attrib['val'] == 'some',
+    [('option', lambda v: v.attrib['val'] == 'some'),
      lambda v: Some(_data_from_xml(v[0]))],
-    [lambda v: v.tag == 'option' and v.attrib['val'] == 'none', lambda _: None],
+    [('option', lambda v: v.attrib['val'] == 'none'), lambda _: None],
     ['pair', lambda v: tuple(_data_from_xml(i) for i in v)],
-    [lambda v: v.tag == 'union' and v.attrib['val'] == 'in_l',
+    [('union', lambda v: v.attrib['val'] == 'in_l'),
      lambda v: UnionL(_data_from_xml(v[0]))],
-    [lambda v: v.tag == 'union' and v.attrib['val'] == 'in_r',
+    [('union', lambda v: v.attrib['val'] == 'in_r'),
      lambda v: UnionR(_data_from_xml(v[0]))],
     # Discard all the decorations of richpp.
     ['richpp', lambda v: ''.join(v.itertext())],
@@ -182,25 +203,40 @@ _CONVERTERS_FROM_XML = [
 ]
 '''The list of converters that deserialize Python objects from XML elements.
 
-Each element in the list is a pair [match, convert]. `match` can be a unary
-function or a str. If it is a str `s`, it is regarded as `lambda v: v.tag ==
-s`.
+Each element in the list is a pair [match, convert]. `match` can be a str or a
+pair (tag, pred). If it is a str `s`, it is regarded as `lambda v: v.tag ==
+s`. If it is a pair, it is regarded as `lambda v: v.tag == tag and pred(v)`.
 
 For a XML element `v`, if `match(v) == True`, `v` is converted to `convert(v)`.
 The converters are tried in the order that they appear in the list.
 '''
 
 
+def _index_converters_from_xml(converters):
+    '''Group the converters by the tag they match.
+
+    Return a dict mapping a tag to the list of pairs (pred, convert) in the
+    original order. `pred` is None if the converter matches the tag only.'''
+    index = {}
+    for match, convert in converters:
+        if isinstance(match, str):
+            tag, pred = match, None
+        else:
+            tag, pred = match
+        index.setdefault(tag, []).append((pred, convert))
+    return index
+
+
+_CONVERTERS_FROM_XML_BY_TAG = _index_converters_from_xml(_CONVERTERS_FROM_XML)
+'''The converters in `_CONVERTERS_FROM_XML` indexed by the tag.'''
+
+
 def _data_from_xml(xml):
     '''Deserialize the XML Element object by the rules defined in
     `_CONVERTERS_FROM_XML`.'''
-    for match, convert in _CONVERTERS_FROM_XML:
-        if isinstance(match, str):
-            if xml.tag == match:
-                return convert(xml)
-        else:
-            if match(xml):
-                return convert(xml)
+    for pred, convert in _CONVERTERS_FROM_XML_BY_TAG.get(xml.tag, ()):
+        if pred is None or pred(xml):
+            return convert(xml)
     raise TypeError('Cannot deserialize [{}] from XML'.format(ET.tostring(xml)))
 
 
@@ -315,6 +351,44 @@ def req_to_xml(rtype, req):
     return _REQ_CONVERTERS[rtype](req)
 
 
+_ADD_REQ_TEMPLATE = (b'<call val="Add"><pair><pair><string>%s</string>'
+                     b'<int>%d</int></pair><pair><state_id val="%d" />'
+                     b'<bool val="%s" /></pair></pair></call>')
+'''The serialized form of `_add_req_to_xml`.'''
+
+
+def _add_req_to_bytes(req):
+    return _ADD_REQ_TEMPLATE % (
+        escape(req['command']).encode('ascii', 'xmlcharrefreplace'),
+        req['edit_id'], req['state_id'].val,
+        b'true' if req['verbose'] else b'false')
+
+
+_FIXED_REQ_BYTES = {
+    'init': ET.tostring(_init_req_to_xml({})),
+    'goal': ET.tostring(_goal_req_to_xml({})),
+}
+'''The serialized requests that do not depend on their arguments.'''
+
+
+_REQ_BYTES_CONVERTERS = {
+    'add': _add_req_to_bytes,
+}
+'''The functions to serialize a request directly without building the XML
+elements.'''
+
+
+def req_to_bytes(rtype, req):
+    '''Convert the request `req` of request type `rtype` to serialized XML.
+
+    The result is the same as `ET.tostring(req_to_xml(rtype, req))`.'''
+    if rtype in _FIXED_REQ_BYTES:
+        return _FIXED_REQ_BYTES[rtype]
+    if rtype in _REQ_BYTES_CONVERTERS:
+        return _REQ_BYTES_CONVERTERS[rtype](req)
+    return ET.tostring(req_to_xml(rtype, req))
+
+
 _RES_CONVERTERS = {
     'init': _init_res_from_xml,
     'add': _add_res_from_xml,
@@ -391,15 +465,11 @@ _FEEDBACK_CONVERTERS = {
 
 
 def feedback_from_xml(xml):
-    '''Convert the feedback `xml` to a dict.'''
+    '''Convert the feedback `xml` to a `Feedback` tuple.'''
     assert xml.tag == 'feedback'
     if xml.attrib['object'] != 'state':
         raise TypeError('Unsupported feedback')
     state_id = _data_from_xml(xml[0])
     content_type = xml[1].attrib['val']
-    feedback = {'type': content_type, 'state_id': state_id}
-    if content_type in _FEEDBACK_CONVERTERS:
-        feedback['content'] = _FEEDBACK_CONVERTERS[content_type](xml[1])
-    else:
-        feedback['content'] = _unhandled_fb_from_xml(xml[1])
-    return feedback
+    converter = _FEEDBACK_CONVERTERS.get(content_type, _unhandled_fb_from_xml)
+    return Feedback(content_type, state_id, converter(xml[1]))
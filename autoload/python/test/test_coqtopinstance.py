@@ -1,40 +1,103 @@
 '''The unit test of module `coqide.coqtopinstance`.'''
 
 import unittest
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 import xml.etree.ElementTree as ET
 
 from coqide import xmlprotocol as xp
-from coqide.coqtopinstance import CoqtopInstance
+from coqide.coqtopinstance import CoqtopInstance, CoqtopQuit, _CoqtopReader
+
+try:
+    import lxml.etree
+except ImportError:
+    lxml = None                              # pylint: disable=C0103
 
 
 # pylint:disable=C0111,R0201
 class TestCoqtopInstance(unittest.TestCase):
+    @patch('coqide.coqtopinstance._enlarge_pipe')
     @patch('coqide.coqtopinstance.Popen')
     @patch('coqide.coqtopinstance._CoqtopReader')
-    def test_spawn(self, reader_mock, popen_mock):
+    def test_spawn(self, reader_mock, popen_mock, enlarge_mock):
         inst = CoqtopInstance()
         inst.spawn(['coqtop', '-ideslave'])
 
         popen_mock.assert_called_once()
         self.assertEqual(popen_mock.call_args[0][0], ['coqtop', '-ideslave'])
         reader_mock.return_value.start.assert_called_once()
+        enlarge_mock.assert_called_once_with(
+            popen_mock.return_value.stdout.fileno.return_value)
 
+    @patch('coqide.coqtopinstance._enlarge_pipe')
+    @patch('coqide.coqtopinstance.os.write')
     @patch('coqide.coqtopinstance.Popen')
     @patch('coqide.coqtopinstance._CoqtopReader')
-    def test_call(self, reader_mock, popen_mock):
+    def test_call(self, reader_mock, popen_mock, write_mock, _):
+        popen_mock.return_value.stdin.closed = False
         inst = CoqtopInstance()
         inst.spawn(['coqtop', '-ideslave'])
 
         xml_str = '<value val="good"><state_id val="42" /></value>'
         xml = ET.fromstring(xml_str)
         reader_mock.return_value.get_response.side_effect = [xml]
+        write_mock.side_effect = lambda _, data: len(data)
 
         inst.call('init', {})
         tag, res = inst.get_response('init')
 
-        write_mock = popen_mock.return_value.stdin.write
-        write_mock.assert_called_once_with(
-            b'<call val="Init"><option val="none" /></call>')
+        write_mock.assert_called_once()
+        fileno = popen_mock.return_value.stdin.fileno.return_value
+        self.assertEqual(write_mock.call_args[0][0], fileno)
+        self.assertEqual(bytes(write_mock.call_args[0][1]),
+                         b'<call val="Init"><option val="none" /></call>')
         self.assertEqual(tag, 'value')
         self.assertEqual(res, ({'init_state_id': xp.StateID(42)}, None))
+
+    @patch('coqide.coqtopinstance._enlarge_pipe')
+    @patch('coqide.coqtopinstance.os.write')
+    @patch('coqide.coqtopinstance.Popen')
+    @patch('coqide.coqtopinstance._CoqtopReader')
+    def test_call_after_begin_close(self, _, popen_mock, write_mock, __):
+        popen_mock.return_value.stdin.closed = False
+        inst = CoqtopInstance()
+        inst.spawn(['coqtop', '-ideslave'])
+        inst.begin_close()
+
+        popen_mock.return_value.stdin.close.assert_called_once()
+        with self.assertRaises(ValueError):
+            inst.call('init', {})
+        write_mock.assert_not_called()
+
+
+# pylint:disable=C0111,W0212
+class TestCoqtopReader(unittest.TestCase):
+    def test_split_responses(self):
+        self._check_split_responses(_CoqtopReader(None))
+
+    @unittest.skipUnless(lxml, 'lxml is not installed')
+    def test_split_responses_lxml(self):
+        with patch('coqide.coqtopinstance.XMLPullParser',
+                   lxml.etree.XMLPullParser):
+            reader = _CoqtopReader(None)
+        self._check_split_responses(reader)
+
+    def _check_split_responses(self, reader):
+        reader._feed(b'<value val="good"><string>a&nbsp;b</str')
+        self.assertEqual(reader.get_responses_nowait(), [])
+        reader._feed(b'ing></value><feedback object="state">')
+        reader._feed(b'<state_id val="1"/><feedback_content val="processed"/>'
+                     b'</feedback>')
+        responses = reader.get_responses_nowait()
+        self.assertEqual([xml.tag for xml in responses], ['value', 'feedback'])
+        self.assertEqual(responses[0][0].text, 'a b')
+        self.assertEqual(len(responses[1]), 2)
+
+    def test_malformed_output(self):
+        pipe = Mock()
+        pipe.read1.side_effect = [
+            b'<value val="good"><string>&foo;</string></value>', b'']
+        reader = _CoqtopReader(pipe)
+        reader._thread_entry()
+        pipe.read1.assert_called_once()
+        with self.assertRaises(CoqtopQuit):
+            reader.get_response()
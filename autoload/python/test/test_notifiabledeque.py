@@ -0,0 +1,50 @@
+'''The unit test of module `coqide.notifiabledeque`.'''
+
+from threading import Thread
+from unittest import TestCase
+
+from coqide.notifiabledeque import NotifiableDeque
+
+
+class TestNotifiableDeque(TestCase):
+    '''Test class `NotifiableDeque`.'''
+
+    def test_fifo(self):
+        '''Test that the items are got in the order they are put.'''
+        queue = NotifiableDeque()
+        queue.put(1)
+        queue.put(2)
+        self.assertEqual(queue.get(), 1)
+        self.assertEqual(queue.get_nowait(), 2)
+        self.assertRaises(IndexError, queue.get_nowait)
+
+    def test_put_many(self):
+        '''Test putting a batch of items.'''
+        queue = NotifiableDeque()
+        queue.put_many([])
+        self.assertRaises(IndexError, queue.get_nowait)
+        queue.put_many([1, 2])
+        self.assertEqual(queue.get(), 1)
+        self.assertEqual(queue.get(), 2)
+
+    def test_blocking_get(self):
+        '''Test that `get` waits for the items put by another thread.'''
+        queue = NotifiableDeque()
+        result = []
+        thread = Thread(target=lambda: result.extend(
+            queue.get() for _ in range(100)))
+        thread.start()
+        for i in range(100):
+            queue.put(i)
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(result, list(range(100)))
+
+    def test_get_all_nowait(self):
+        '''Test taking all the items at once.'''
+        queue = NotifiableDeque()
+        self.assertEqual(queue.get_all_nowait(), [])
+        queue.put_many([1, 2, 3])
+        self.assertEqual(queue.get_all_nowait(), [1, 2, 3])
+        self.assertEqual(queue.get_all_nowait(), [])
+        self.assertRaises(IndexError, queue.get_nowait)
@@ -2,8 +2,9 @@
 
 from threading import Semaphore
 from unittest import TestCase
-from unittest.mock import patch
+from unittest.mock import Mock, call, patch
 
+from coqide.notifiabledeque import NotifiableDeque
 from coqide.plugin import _ThreadExecutor, Plugin
 
 
@@ -36,3 +37,97 @@ class TestThreadExecutor(TestCase):
             self.assertFalse(worker.is_busy())
         finally:
             worker.shutdown()
+
+    def test_shutdown_cancel(self):
+        '''Test that `shutdown` cancels the tasks not yet started.'''
+        started_sem = Semaphore(0)
+        go_sem = Semaphore(0)
+        result = []
+        worker = _ThreadExecutor()
+
+        def _blocking_task():
+            started_sem.release()
+            go_sem.acquire()
+            result.append(1)
+
+        def _put(queue, item, put=NotifiableDeque.put):
+            # Called by `shutdown` once the queue has been drained.
+            go_sem.release()
+            put(queue, item)
+
+        worker.submit(_blocking_task)
+        worker.submit(result.append, 2)
+        started_sem.acquire()
+        with patch.object(NotifiableDeque, 'put', _put):
+            worker.shutdown()
+        self.assertEqual(result, [1])
+        self.assertFalse(worker.is_busy())
+
+    @patch('coqide.plugin.logger')
+    def test_task_exception(self, logger):
+        '''Test that a failing task does not stop the later tasks.'''
+        finish_sem = Semaphore(0)
+        worker = _ThreadExecutor()
+
+        try:
+            worker.submit(lambda: 1 / 0)
+            worker.submit(finish_sem.release)
+            self.assertTrue(finish_sem.acquire(timeout=5))
+            logger.exception.assert_called_once()
+        finally:
+            worker.shutdown()
+
+
+# pylint: disable=W0212
+class TestPlugin(TestCase):
+    '''Test class `Plugin`.'''
+
+    @patch('coqide.plugin._ThreadExecutor')
+    @patch('coqide.plugin.TabpageView')
+    @patch('coqide.plugin.VimSupport')
+    def test_session_command(self, VimSupport, _, _ThreadExecutor):  # pylint: disable=C0103
+        '''Test the commands decorated with `_session_command`.'''
+        plugin = Plugin()
+        session = Mock()
+        session_view = Mock()
+        VimSupport.return_value.get_buffer.return_value.number = 3
+        worker = _ThreadExecutor.return_value
+        worker.is_busy.return_value = False
+
+        with patch('builtins.print') as print_mock:
+            plugin.forward_one()
+            print_mock.assert_called_once_with('Not in a Coq session')
+
+        plugin._sessions[3] = session
+        plugin._session_views[3] = session_view
+        plugin.forward_one()
+        session.forward_one.assert_called_once_with()
+        session_view.draw.assert_called_once_with()
+
+        worker.is_busy.return_value = True
+        plugin.backward_one()
+        session.backward_one.assert_not_called()
+
+        worker.is_busy.return_value = False
+        session.to_cursor.side_effect = RuntimeError
+        with patch('coqide.plugin.logger') as logger:
+            plugin.to_cursor()
+            logger.exception.assert_called_once()
+        self.assertEqual(session_view.draw.call_count, 3)
+
+    @patch('coqide.plugin._ThreadExecutor')
+    @patch('coqide.plugin.TabpageView')
+    @patch('coqide.plugin.VimSupport')
+    def test_cleanup(self, *_):
+        '''Test that all the sessions are asked to quit before being closed.'''
+        plugin = Plugin()
+        manager = Mock()
+        plugin._sessions[1] = manager.session1
+        plugin._sessions[2] = manager.session2
+
+        plugin.cleanup()
+        self.assertEqual(manager.mock_calls[:2], [call.session1.begin_close(),
+                                                  call.session2.begin_close()])
+        manager.session1.close.assert_called_once_with()
+        manager.session2.close.assert_called_once_with()
+        self.assertEqual(plugin._sessions, {})
@@ -85,15 +85,16 @@ class TestSession(TestCase):
             Sentence('', Mark(2, 3), Mark(3, 5)),
             Sentence('', Mark(3, 5), Mark(4, 1)),
             Sentence('', Mark(4, 1), Mark(4, 9)),
-            None
         ]
         stm.get_tip_stop.side_effect = [Mark(2, 3)]
         stm.get_end_stop.side_effect = [Mark(2, 3)]
         vim.get_cursor.side_effect = [Mark(4, 9)]
-        vim.get_sentence_after.side_effect = sentences
+        vim.get_sentences_between.side_effect = [sentences]
 
         session.to_cursor()
-        stm.add.assert_called_once_with(sentences[:-1])
+        vim.get_sentences_between.assert_called_once_with(Mark(2, 3),
+                                                          Mark(4, 9))
+        stm.add.assert_called_once_with(sentences)
 
     @patch('coqide.session.CoqtopInstance')
     @patch('coqide.session.STM')
@@ -120,5 +121,7 @@ class TestSession(TestCase):
         vim = Mock()
         worker = self._worker_mock()
         session = Session(view, vim, worker)
+        session.begin_close()
+        CoqtopInstance.return_value.begin_close.assert_called_once_with()
         session.close()
         CoqtopInstance.return_value.close.assert_called_once_with()
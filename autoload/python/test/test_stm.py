@@ -4,7 +4,8 @@ from unittest import TestCase
 from unittest.mock import Mock, call
 
 from coqide.stm import _State, _StateList, STM
-from coqide.types import StateID, Sentence, Mark, Message
+from coqide.types import StateID, Sentence, Mark, Message, Feedback, \
+    Location
 
 
 class TestState(TestCase):
@@ -46,6 +47,28 @@ class TestState(TestCase):
         view_mock.new_match.assert_called_with(
             (StateID(3), 2), Mark(1, 1), Mark(2, 8), 'verified')
 
+    def test_set_same_flag(self):
+        '''Test setting the flag to the current flag.'''
+        view_mock = Mock()
+        state = _State(StateID(3), self._SENTENCE_EX, view_mock)
+        state.set_flag('axiom')
+        state.set_flag('axiom')
+        view_mock.new_match.assert_called_once_with(
+            (StateID(3), 1), Mark(1, 1), Mark(2, 8), 'axiom')
+        view_mock.remove_match.assert_not_called()
+
+    def test_set_error_flag(self):
+        '''Test setting and clearing the "error" flag with an error part.'''
+        view_mock = Mock()
+        state = _State(StateID(3), self._SENTENCE_EX, view_mock)
+        state.set_flag('error', Location(3, 12))
+        self.assertListEqual(view_mock.new_match.call_args_list, [
+            call((StateID(3), 1), Mark(1, 1), Mark(2, 8), 'error'),
+            call((StateID(3), 2), Mark(1, 4), Mark(2, 2), 'error_part')])
+        state.set_flag(None)
+        self.assertListEqual(view_mock.remove_match.call_args_list, [
+            call((StateID(3), 1)), call((StateID(3), 2))])
+
     def test_offset_to_mark(self):
         '''Test the function transforming offsets in the sentence to marks.'''
         view_mock = Mock()
@@ -60,6 +83,15 @@ class TestState(TestCase):
         mark = state.offset_to_mark(18)
         self.assertEqual(mark, Mark(2, 8))
 
+        mark = state.offset_to_mark(10)
+        self.assertEqual(mark, Mark(1, 11))
+
+        mark = state.offset_to_mark(11)
+        self.assertEqual(mark, Mark(2, 1))
+
+        mark = state.offset_to_mark(100)
+        self.assertEqual(mark, Mark(2, 9))
+
 
 class TestStateList(TestCase):
     '''Test class `coqide.stm._StateList`.'''
@@ -84,6 +116,62 @@ class TestStateList(TestCase):
         slist.insert(sta2, sta3)
         self.assertEqual(slist.find_by_mark(Mark(2, 4)), sta2)
         self.assertEqual(slist.find_by_mark(Mark(3, 1)), sta3)
+        self.assertEqual(slist.find_by_mark(Mark(1, 5)), sta1)
+        self.assertEqual(slist.find_by_mark(Mark(2, 10)), sta3)
+
+    def test_find_by_mark_removed(self):
+        '''Test method `find_by_mark` after removing states.'''
+        slist = _StateList()
+        sta1 = _State.initial(StateID(1))
+        slist.init(sta1)
+        sta2 = _State(StateID(2), Sentence('', Mark(1, 1), Mark(2, 3)), None)
+        slist.insert(sta1, sta2)
+        sta3 = _State(StateID(3), Sentence('', Mark(2, 3), Mark(2, 10)), None)
+        slist.insert(sta2, sta3)
+        slist.remove_between(sta1, sta2)
+        self.assertEqual(slist.find_by_mark(Mark(2, 4)), sta1)
+        self.assertEqual(slist.find_by_mark(Mark(3, 1)), sta3)
+        slist.remove_after(sta1)
+        self.assertEqual(slist.find_by_mark(Mark(3, 1)), sta1)
+
+    def test_has_sentence(self):
+        '''Test method `has_sentence`.'''
+        slist = _StateList()
+        sta1 = _State.initial(StateID(1))
+        slist.init(sta1)
+        sen2 = Sentence('a.', Mark(1, 1), Mark(1, 3))
+        sen3 = Sentence(' b.', Mark(1, 3), Mark(1, 6))
+        sta2 = _State(StateID(2), sen2, None)
+        slist.insert(sta1, sta2)
+        sta3 = _State(StateID(3), sen3, None)
+        slist.insert(sta2, sta3)
+        self.assertTrue(slist.has_sentence(sen2))
+        self.assertTrue(slist.has_sentence(sen3))
+        self.assertFalse(slist.has_sentence(
+            Sentence(' c.', Mark(1, 3), Mark(1, 6))))
+        self.assertFalse(slist.has_sentence(
+            Sentence(' c.', Mark(1, 6), Mark(1, 9))))
+        slist.remove_after(sta2)
+        self.assertFalse(slist.has_sentence(sen3))
+
+    def test_has_sentence_shared_stop(self):
+        '''Test method `has_sentence` with states sharing a stop mark.'''
+        slist = _StateList()
+        sta1 = _State.initial(StateID(1))
+        slist.init(sta1)
+        sen2 = Sentence('', Mark(1, 1), Mark(1, 3))
+        sen3 = Sentence('a.', Mark(1, 1), Mark(1, 3))
+        sta2 = _State(StateID(2), sen2, None)
+        slist.insert(sta1, sta2)
+        sta3 = _State(StateID(3), sen3, None)
+        slist.insert(sta2, sta3)
+        self.assertTrue(slist.has_sentence(sen2))
+        self.assertTrue(slist.has_sentence(sen3))
+        self.assertFalse(slist.has_sentence(
+            Sentence('b.', Mark(1, 1), Mark(1, 3))))
+        slist.remove_after(sta2)
+        self.assertTrue(slist.has_sentence(sen2))
+        self.assertFalse(slist.has_sentence(sen3))
 
     def test_insert_end(self):
         '''Test inserting at the end.'''
@@ -142,6 +230,8 @@ class TestStateList(TestCase):
         slist.insert(sta2, sta3)
         slist.remove_after(sta1)
         self.assertEqual(list(slist.iter_after(sta1)), [])
+        self.assertIsNone(sta2.next)
+        self.assertIsNone(sta3.prev)
 
 
 class TestSTM(TestCase):
@@ -224,7 +314,7 @@ class TestSTM(TestCase):
         view.new_match.side_effect = [match2_new]
 
         stm.process_feedback(
-            {'type': 'axiom', 'state_id': StateID(2), 'content': {}})
+            Feedback(type='axiom', state_id=StateID(2), content={}))
 
         view.remove_match.assert_called_once_with((StateID(2), 1))
         view.new_match.assert_called_once_with(
@@ -238,7 +328,7 @@ class TestSTM(TestCase):
         view.new_match.side_effect = [match2_new]
 
         stm.process_feedback(
-            {'type': 'processed', 'state_id': StateID(2), 'content': {}})
+            Feedback(type='processed', state_id=StateID(2), content={}))
 
         view.remove_match.assert_called_once_with((StateID(2), 1))
         view.new_match.assert_called_once_with(
@@ -252,9 +342,9 @@ class TestSTM(TestCase):
         view.new_match.side_effect = [match2_new]
 
         stm.process_feedback(
-            {'type': 'axiom', 'state_id': StateID(2), 'content': {}})
+            Feedback(type='axiom', state_id=StateID(2), content={}))
         stm.process_feedback(
-            {'type': 'processed', 'state_id': StateID(2), 'content': {}})
+            Feedback(type='processed', state_id=StateID(2), content={}))
 
         view.remove_match.assert_called_once_with((StateID(2), 1))
         view.new_match.assert_called_once_with(
@@ -265,10 +355,40 @@ class TestSTM(TestCase):
         stm, _, view = self._new_stm()
 
         stm.process_feedback(
-            {'type': 'message',
-             'state_id': StateID(2),
-             'content': {
-                 'message': Message(level='notice', text='Notice'),
-                 'loc': None}})
+            Feedback(type='message',
+                     state_id=StateID(2),
+                     content={
+                         'message': Message(level='notice', text='Notice'),
+                         'loc': None}))
 
         view.show_message.assert_called_once_with('notice', 'Notice')
+
+    def test_process_feedback_many(self):
+        '''Test method `process_feedback_many` on a batch of feedbacks.'''
+        stm, _, view = self._new_stm()
+        fb_handler = Mock()
+        stm._fb_handler = fb_handler        # pylint: disable=W0212
+
+        unknown = Feedback(type='unknown', state_id=StateID(2), content={})
+        stm.process_feedback_many([
+            Feedback(type='axiom', state_id=StateID(2), content={}),
+            unknown,
+            Feedback(type='processed', state_id=StateID(2), content={})])
+
+        view.remove_match.assert_called_once_with((StateID(2), 1))
+        view.new_match.assert_called_once_with(
+            (StateID(2), 2), Mark(1, 1), Mark(3, 1), 'axiom')
+        fb_handler.assert_called_once_with(unknown)
+
+    def test_process_processed_in_order(self):
+        '''Test method `process_feedback_many` on consecutive "processed".'''
+        stm, _, view = self._new_stm()
+
+        stm.process_feedback_many([
+            Feedback(type='processed', state_id=StateID(2), content={}),
+            Feedback(type='processed', state_id=StateID(3), content={}),
+            Feedback(type='processed', state_id=StateID(2), content={})])
+
+        self.assertListEqual(view.new_match.call_args_list, [
+            call((StateID(2), 2), Mark(1, 1), Mark(3, 1), 'verified'),
+            call((StateID(3), 2), Mark(3, 1), Mark(4, 1), 'verified')])
@@ -0,0 +1,29 @@
+'''Test for module `coqide.tasks`.'''
+
+from unittest import TestCase
+from unittest.mock import Mock
+
+from coqide import tasks
+
+
+class TestTasks(TestCase):
+    '''Test functions `dispatch` and `run_tasks`.'''
+
+    def test_run_tasks(self):
+        '''Test that the dispatched tasks are run in order once.'''
+        func = Mock()
+        tasks.dispatch(func, 1)
+        tasks.dispatch(func, 2, key=3)
+        tasks.run_tasks()
+        self.assertEqual(func.call_args_list, [((1,), {}), ((2,), {'key': 3})])
+        tasks.run_tasks()
+        self.assertEqual(func.call_count, 2)
+
+    def test_dispatch_in_task(self):
+        '''Test that a task can dispatch another task.'''
+        inner = Mock()
+        tasks.dispatch(tasks.dispatch, inner)
+        tasks.run_tasks()
+        inner.assert_not_called()
+        tasks.run_tasks()
+        inner.assert_called_once_with()
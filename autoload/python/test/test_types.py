@@ -0,0 +1,55 @@
+'''Test for module `coqide.types`.'''
+
+from unittest import TestCase
+
+from coqide.types import Goal, Goals, Mark
+
+
+class TestMark(TestCase):
+    '''Test class `Mark`.'''
+
+    def test_order(self):
+        '''Test that marks are ordered by line and then by column.'''
+        self.assertLess(Mark(1, 9), Mark(2, 1))
+        self.assertLess(Mark(2, 1), Mark(2, 3))
+        self.assertGreater(Mark(3, 1), Mark(2, 10))
+        self.assertLessEqual(Mark(2, 3), Mark(2, 3))
+
+
+class TestGoals(TestCase):
+    '''Test class `Goals`.'''
+
+    def test_no_goals(self):
+        '''Test method `tolines` without any goal.'''
+        self.assertListEqual(Goals([], [], [], []).tolines(),
+                             ['No more subgoals.'])
+
+    def test_fg_goals(self):
+        '''Test method `tolines` with focused goals.'''
+        goals = Goals([Goal('1', ['H: A', 'H0: B\n  /\\ C'], 'A /\\ B'),
+                       Goal('2', [], 'C')], [], [], [])
+        self.assertListEqual(goals.tolines(), [
+            '2 subgoals',
+            'H: A',
+            'H0: B',
+            '  /\\ C',
+            '_______________________ (1/2)',
+            'A /\\ B',
+            '_______________________ (2/2)',
+            'C',
+        ])
+
+    def test_bg_goals(self):
+        '''Test method `tolines` with only unfocused goals.'''
+        goals = Goals([], [([Goal('1', [], 'A')], [Goal('2', [], 'B')]),
+                           ([], [Goal('3', [], 'C')])], [], [])
+        self.assertListEqual(goals.tolines(), [
+            'This subproof is complete, but there are some unfocused goals:',
+            '',
+            '_______________________ (1/3)',
+            'A',
+            '_______________________ (2/3)',
+            'B',
+            '_______________________ (3/3)',
+            'C',
+        ])
@@ -113,6 +113,7 @@ class TestMatchView(TestCase):
         '''Test method `add` when the view is active.'''
         vim = Mock()
         vim.in_winid = MagicMock()
+        vim.batch_matches = MagicMock()
         view = _MatchView(vim)
         view.set_active(3)
         view.add(42, Mark(1, 1), Mark(2, 4), 'sent')
@@ -124,10 +125,39 @@ class TestMatchView(TestCase):
         ])
         vim.in_winid.assert_called_with(3)
 
+    def test_draw_unchanged(self):
+        '''Test that `draw` does nothing if there are no changes.'''
+        vim = Mock()
+        vim.in_winid = MagicMock()
+        vim.batch_matches = MagicMock()
+        view = _MatchView(vim)
+        view.set_active(3)
+        view.add(42, Mark(1, 1), Mark(2, 4), 'sent')
+        view.draw()
+        vim.reset_mock()
+        view.draw()
+        vim.in_winid.assert_not_called()
+
+    def test_move(self):
+        '''Test method `move`.'''
+        vim = Mock()
+        vim.in_winid = MagicMock()
+        vim.batch_matches = MagicMock()
+        vim.add_match.side_effect = ['x', 'y']
+        view = _MatchView(vim)
+        view.set_active(3)
+        view.add(42, Mark(1, 2), Mark(2, 4), 'sent')
+        view.draw()
+        view.move(42, 3)
+        view.draw()
+        vim.del_match.assert_called_once_with('x')
+        vim.add_match.assert_called_with(Mark(4, 2), Mark(5, 4), 'CoqStcSent')
+
     def test_add_inactive(self):
         '''Test method `add` when the view is inactive.'''
         vim = Mock()
         vim.in_winid = MagicMock()
+        vim.batch_matches = MagicMock()
         view = _MatchView(vim)
         view.add(42, Mark(1, 1), Mark(2, 4), 'sent')
         view.add(43, Mark(2, 4), Mark(2, 7), 'verified')
@@ -139,6 +169,7 @@ class TestMatchView(TestCase):
         '''Test method `set_active` with matches.'''
         vim = Mock()
         vim.in_winid = MagicMock()
+        vim.batch_matches = MagicMock()
         view = _MatchView(vim)
         view.add(42, Mark(1, 1), Mark(2, 4), 'sent')
         view.add(43, Mark(2, 4), Mark(2, 7), 'verified')
@@ -148,6 +179,7 @@ class TestMatchView(TestCase):
 
         view.set_active(3)
         vim.in_winid.assert_called_once_with(3)
+        vim.batch_matches.assert_called_once_with()
         self.assertListEqual(vim.add_match.call_args_list, [
             call(Mark(1, 1), Mark(2, 4), 'CoqStcSent'),
             call(Mark(2, 4), Mark(2, 7), 'CoqStcVerified'),
@@ -157,6 +189,7 @@ class TestMatchView(TestCase):
         '''Test method `set_inactive` with matches.'''
         vim = Mock()
         vim.in_winid = MagicMock()
+        vim.batch_matches = MagicMock()
         vim.add_match.side_effect = ['x', 'y']
         view = _MatchView(vim)
         view.set_active(3)
@@ -167,6 +200,25 @@ class TestMatchView(TestCase):
 
         view.set_inactive(3)
         vim.in_winid.assert_called_once_with(3)
+        vim.batch_matches.assert_called_once_with()
+        self.assertListEqual(vim.del_match.call_args_list,
+                             [call('x'), call('y')])
+
+    def test_set_inactive_pending(self):
+        '''Test method `set_inactive` with a pending removal.'''
+        vim = Mock()
+        vim.in_winid = MagicMock()
+        vim.batch_matches = MagicMock()
+        vim.add_match.side_effect = ['x', 'y']
+        view = _MatchView(vim)
+        view.set_active(3)
+        view.add(42, Mark(1, 1), Mark(2, 4), 'sent')
+        view.add(43, Mark(2, 4), Mark(2, 7), 'verified')
+        view.draw()
+        view.remove(42)
+        vim.reset_mock()
+
+        view.set_inactive(3)
         self.assertListEqual(vim.del_match.call_args_list,
                              [call('x'), call('y')])
 
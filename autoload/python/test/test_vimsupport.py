@@ -38,6 +38,45 @@ class TestVimSupport(TestCase):
         self.assertEqual(sentence,
                          Sentence('\nQed.', Mark(2, 15), Mark(3, 5)))
 
+    def test_get_sentences_between(self):
+        '''Test method `get_sentences_between`.'''
+        api = Mock()
+        api.current.buffer = [
+            'Proof. simpl.',
+            '  reflexivity.',
+            'Qed.']
+        vim = VimSupport(api)
+        sentences = vim.get_sentences_between(Mark(1, 1), Mark(2, 15))
+        self.assertListEqual(sentences, [
+            Sentence('Proof.', Mark(1, 1), Mark(1, 7)),
+            Sentence(' simpl.', Mark(1, 7), Mark(1, 14)),
+            Sentence('\n  reflexivity.', Mark(1, 14), Mark(2, 15)),
+        ])
+        sentences = vim.get_sentences_between(Mark(1, 7), Mark(9, 1))
+        self.assertListEqual(sentences, [
+            Sentence(' simpl.', Mark(1, 7), Mark(1, 14)),
+            Sentence('\n  reflexivity.', Mark(1, 14), Mark(2, 15)),
+            Sentence('\nQed.', Mark(2, 15), Mark(3, 5)),
+        ])
+
+    def test_get_sentences_between_slice(self):
+        '''Test that `get_sentences_between` reads the lines in one slice.'''
+
+        class _Buffer(list):
+            def __getitem__(self, index):
+                if not isinstance(index, slice):
+                    raise AssertionError('Line read one by one')
+                return list.__getitem__(self, index)
+
+        api = Mock()
+        api.current.buffer = _Buffer(['Proof. simpl.', '  reflexivity.', 'Qed.'])
+        vim = VimSupport(api)
+        sentences = vim.get_sentences_between(Mark(1, 7), Mark(2, 15))
+        self.assertListEqual(sentences, [
+            Sentence(' simpl.', Mark(1, 7), Mark(1, 14)),
+            Sentence('\n  reflexivity.', Mark(1, 14), Mark(2, 15)),
+        ])
+
     def test_get_cursor(self):
         '''Test method `get_cursor`.'''
         api = Mock()
@@ -72,6 +111,51 @@ class TestVimSupport(TestCase):
             call('matchdelete(2)'),
         ])
 
+    def test_batch_matches(self):
+        '''Test method `batch_matches`.'''
+        api = Mock()
+        api.eval.side_effect = lambda cmd: ['5', '6'] \
+            if cmd.startswith('[matchaddpos') else None
+        api.current.buffer = ['aaaa', 'bbbb']
+        vim = VimSupport(api)
+        with vim.batch_matches():
+            ids1 = vim.add_match(Mark(1, 1), Mark(1, 3), 'CoqStcSent')
+            ids2 = vim.add_match(Mark(2, 1), Mark(2, 4), 'CoqStcError')
+            vim.del_match(ids1)
+            vim.del_match([3])
+            api.eval.assert_not_called()
+        self.assertEqual(ids1, [5])
+        self.assertEqual(ids2, [6])
+        self.assertListEqual(api.eval.call_args_list, [
+            call('[matchaddpos("CoqStcSent", [[1, 1, 2]]), '
+                 'matchaddpos("CoqStcError", [[2, 1, 3]])]'),
+            call('[matchdelete(5), matchdelete(3)]'),
+        ])
+
+    def test_batch_matches_stale(self):
+        '''Test method `batch_matches` with a match that no longer exists.'''
+        class _VimError(Exception):
+            pass
+
+        def _eval(cmd):
+            if cmd == '[matchdelete(3), matchdelete(4)]' or \
+                    cmd == 'matchdelete(3)':
+                raise _VimError('E803: ID not found: 3')
+            return None
+
+        api = Mock()
+        api.error = _VimError
+        api.eval.side_effect = _eval
+        vim = VimSupport(api)
+        with vim.batch_matches():
+            vim.del_match([3])
+            vim.del_match([4])
+        self.assertListEqual(api.eval.call_args_list, [
+            call('[matchdelete(3), matchdelete(4)]'),
+            call('matchdelete(3)'),
+            call('matchdelete(4)'),
+        ])
+
     def test_in_winid(self):
         '''Test method `in_winid`.'''
         def _eval(cmd):
@@ -39,6 +39,31 @@ class TestRequestsToXml(unittest.TestCase):
         self.assertEqual(out, b'<call val="Goal"><unit /></call>')
 
 
+class TestRequestsToBytes(unittest.TestCase):
+    def _assert_same_as_xml(self, rtype, req):
+        self.assertEqual(xp.req_to_bytes(rtype, req),
+                         ET.tostring(xp.req_to_xml(rtype, req)))
+
+    def test_init_req(self):
+        self._assert_same_as_xml('init', {})
+
+    def test_goal_req(self):
+        self._assert_same_as_xml('goal', {})
+
+    def test_edit_at_req(self):
+        self._assert_same_as_xml('edit_at', {'state_id': xp.StateID(12)})
+
+    def test_add_req(self):
+        for command, verbose in [('reflexivity.', True),
+                                 ('Check "a<b" && \'x\'.', False),
+                                 ('Definition α := 1.', True)]:
+            self._assert_same_as_xml('add', {
+                'command': command,
+                'edit_id': -1,
+                'state_id': xp.StateID(4),
+                'verbose': verbose})
+
+
 class TestValuesFromXml(unittest.TestCase):
     def test_init_res(self):
         text = '<value val="good"><state_id val="42" /></value>'
@@ -127,9 +152,9 @@ class TestFeedbacksFromXml(unittest.TestCase):
 '''
         xml = ET.fromstring(text)
         res = xp.feedback_from_xml(xml)
-        self.assertEqual(res, {'type': 'addedaxiom',
-                               'state_id': xp.StateID(42),
-                               'content': {}})
+        self.assertEqual(res, xp.Feedback(type='addedaxiom',
+                                          state_id=xp.StateID(42),
+                                          content={}))
 
     def test_fb_errormsg(self):
         text = '''
@@ -143,12 +168,12 @@ class TestFeedbacksFromXml(unittest.TestCase):
 '''
         xml = ET.fromstring(text)
         res = xp.feedback_from_xml(xml)
-        self.assertEqual(res, {'type': 'errormsg',
-                               'state_id': xp.StateID(42),
-                               'content': {
-                                   'loc': xp.Location(3, 5),
-                                   'message': xp.Message('error', 'Error')
-                               }})
+        self.assertEqual(res, xp.Feedback(type='errormsg',
+                                          state_id=xp.StateID(42),
+                                          content={
+                                              'loc': xp.Location(3, 5),
+                                              'message': xp.Message('error', 'Error')
+                                          }))
 
     def test_fb_filedep_wo_source(self):
         text = '''
@@ -162,12 +187,12 @@ class TestFeedbacksFromXml(unittest.TestCase):
 '''
         xml = ET.fromstring(text)
         res = xp.feedback_from_xml(xml)
-        self.assertEqual(res, {'type': 'filedependency',
-                               'state_id': xp.StateID(42),
-                               'content': {
-                                   'dependency': 'a.v',
-                                   'source': None,
-                               }})
+        self.assertEqual(res, xp.Feedback(type='filedependency',
+                                          state_id=xp.StateID(42),
+                                          content={
+                                              'dependency': 'a.v',
+                                              'source': None,
+                                          }))
 
     def test_fb_filedep_w_source(self):
         text = '''
@@ -181,12 +206,12 @@ class TestFeedbacksFromXml(unittest.TestCase):
 '''
         xml = ET.fromstring(text)
         res = xp.feedback_from_xml(xml)
-        self.assertEqual(res, {'type': 'filedependency',
-                               'state_id': xp.StateID(42),
-                               'content': {
-                                   'dependency': 'a.v',
-                                   'source': xp.Some('s.v'),
-                               }})
+        self.assertEqual(res, xp.Feedback(type='filedependency',
+                                          state_id=xp.StateID(42),
+                                          content={
+                                              'dependency': 'a.v',
+                                              'source': xp.Some('s.v'),
+                                          }))
 
     def test_fb_fileloaded(self):
         text = '''
@@ -200,12 +225,12 @@ class TestFeedbacksFromXml(unittest.TestCase):
 '''
         xml = ET.fromstring(text)
         res = xp.feedback_from_xml(xml)
-        self.assertEqual(res, {'type': 'fileloaded',
-                               'state_id': xp.StateID(42),
-                               'content': {
-                                   'module': 'Module',
-                                   'vo_file_name': 'Module.v',
-                               }})
+        self.assertEqual(res, xp.Feedback(type='fileloaded',
+                                          state_id=xp.StateID(42),
+                                          content={
+                                              'module': 'Module',
+                                              'vo_file_name': 'Module.v',
+                                          }))
 
     def test_fb_incomplete(self):
         text = '''
@@ -216,9 +241,9 @@ class TestFeedbacksFromXml(unittest.TestCase):
 '''
         xml = ET.fromstring(text)
         res = xp.feedback_from_xml(xml)
-        self.assertEqual(res, {'type': 'incomplete',
-                               'state_id': xp.StateID(42),
-                               'content': {}})
+        self.assertEqual(res, xp.Feedback(type='incomplete',
+                                          state_id=xp.StateID(42),
+                                          content={}))
 
     def test_fb_inprogress(self):
         text = '''
@@ -231,9 +256,9 @@ class TestFeedbacksFromXml(unittest.TestCase):
 '''
         xml = ET.fromstring(text)
         res = xp.feedback_from_xml(xml)
-        self.assertEqual(res, {'type': 'inprogress',
-                               'state_id': xp.StateID(42),
-                               'content': {}})
+        self.assertEqual(res, xp.Feedback(type='inprogress',
+                                          state_id=xp.StateID(42),
+                                          content={}))
 
     def test_fb_message(self):
         text = '''
@@ -250,12 +275,12 @@ class TestFeedbacksFromXml(unittest.TestCase):
 '''
         xml = ET.fromstring(text)
         res = xp.feedback_from_xml(xml)
-        self.assertEqual(res, {'type': 'message',
-                               'state_id': xp.StateID(42),
-                               'content': {
-                                   'loc': xp.Location(3, 5),
-                                   'message': xp.Message('info', 'Message')
-                               }})
+        self.assertEqual(res, xp.Feedback(type='message',
+                                          state_id=xp.StateID(42),
+                                          content={
+                                              'loc': xp.Location(3, 5),
+                                              'message': xp.Message('info', 'Message')
+                                          }))
 
     def test_fb_message_noloc(self):
         text = '''
@@ -271,12 +296,12 @@ class TestFeedbacksFromXml(unittest.TestCase):
 '''
         xml = ET.fromstring(text)
         res = xp.feedback_from_xml(xml)
-        self.assertEqual(res, {'type': 'message',
-                               'state_id': xp.StateID(42),
-                               'content': {
-                                   'loc': None,
-                                   'message': xp.Message('info', 'Message'),
-                               }})
+        self.assertEqual(res, xp.Feedback(type='message',
+                                          state_id=xp.StateID(42),
+                                          content={
+                                              'loc': None,
+                                              'message': xp.Message('info', 'Message'),
+                                          }))
 
     def test_fb_processed(self):
         text = '''
@@ -287,9 +312,9 @@ class TestFeedbacksFromXml(unittest.TestCase):
 '''
         xml = ET.fromstring(text)
         res = xp.feedback_from_xml(xml)
-        self.assertEqual(res, {'type': 'processed',
-                               'state_id': xp.StateID(42),
-                               'content': {}})
+        self.assertEqual(res, xp.Feedback(type='processed',
+                                          state_id=xp.StateID(42),
+                                          content={}))
 
     def test_fb_processingin(self):
         text = '''
@@ -302,6 +327,6 @@ class TestFeedbacksFromXml(unittest.TestCase):
 '''
         xml = ET.fromstring(text)
         res = xp.feedback_from_xml(xml)
-        self.assertEqual(res, {'type': 'processingin',
-                               'state_id': xp.StateID(42),
-                               'content': {'worker': 'master'}})
+        self.assertEqual(res, xp.Feedback(type='processingin',
+                                          state_id=xp.StateID(42),
+                                          content={'worker': 'master'}))